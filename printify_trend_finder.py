@@ -3,42 +3,326 @@ USA Printify/Print-on-Demand Trend Finder
 Discovers trending niches, themes, and product opportunities
 """
 
+import io
 import os
+import re
 import json
-from datetime import datetime
-import anthropic
-import requests
 import time
+import hashlib
+import pathlib
+import functools
+import threading
+from datetime import date
+import anthropic
+import httpx
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
 from google.oauth2 import service_account
 from googleapiclient.discovery import build
 
+try:
+    import orjson
+except ImportError:  # fall back to the stdlib decoder
+    orjson = None
+
+# Number of opportunities requested per run, and the output budget for each
+NUM_OPPORTUNITIES = 10
+TOKENS_PER_OPPORTUNITY = 400
+
+# Static analysis instructions, sent as a cached system prompt. Keep this
+# byte-identical between runs so Anthropic prompt caching can reuse it.
+STATIC_INSTRUCTIONS = f"""You are a print-on-demand business consultant specializing in USA market Printify/Shopify stores.
+
+Analyze the trending topics and themes from USA provided by the user.
+
+Provide {NUM_OPPORTUNITIES} SPECIFIC print-on-demand product opportunities. For each opportunity:
+
+- niche: NICHE NAME (specific, not generic)
+- audience: TARGET AUDIENCE - Who buys this?
+- design_theme: DESIGN THEME - What should the design look like/say?
+- products: PRODUCTS - Which POD products? (t-shirt, hoodie, mug, etc.)
+- demand_score: DEMAND SCORE - integer 1-10 (how hot is this trend?)
+- competition: COMPETITION - Low/Medium/High
+- design_examples: DESIGN EXAMPLES - 3 specific text/image ideas
+- why_works: WHY IT WORKS - What makes this profitable?
+- ad_angle: FACEBOOK AD ANGLE - How to market this?
+- est_revenue: ESTIMATED MONTHLY REVENUE - Realistic estimate if executed well
+
+Focus on:
+- Specific niches (not just "dog lovers" but "golden retriever moms")
+- Actionable design ideas
+- USA cultural trends
+- Passion-based audiences
+- Gift-giving occasions
+- Identity/lifestyle niches
+
+Return ONLY a JSON array of {NUM_OPPORTUNITIES} objects with keys: niche, audience, design_theme, products, demand_score, competition, design_examples, why_works, ad_angle, est_revenue. All values are strings except demand_score. No prose."""
+
+# USA demographic segments
+TARGET_AUDIENCES = (
+    'millennials', 'gen z', 'parents', 'dog owners', 'cat owners',
+    'teachers', 'nurses', 'fitness enthusiasts', 'gamers',
+    'book lovers', 'coffee lovers', 'outdoor enthusiasts'
+)
+
+# Product types for POD
+PRODUCT_TYPES = (
+    't-shirt', 'hoodie', 'mug', 'tote bag', 'phone case',
+    'sticker', 'poster', 'canvas print', 'tank top'
+)
+
+# Opportunity keys in Sheets column order (B:K), with their fallback values
+OPPORTUNITY_COLUMNS = (
+    ('niche', ''),
+    ('audience', ''),
+    ('design_theme', ''),
+    ('products', ''),
+    ('demand_score', 5),
+    ('competition', 'Medium'),
+    ('design_examples', ''),
+    ('why_works', ''),
+    ('ad_angle', ''),
+    ('est_revenue', ''),
+)
+
+NON_WORD_RE = re.compile(r'\W+')
+DEMAND_SCORE_RE = re.compile(r'\d+')
+
+# Decodes the first JSON value in a string, ignoring any trailing text
+JSON_DECODER = json.JSONDecoder()
+# Whitespace and commas between elements of a JSON array
+JSON_SEPARATOR_RE = re.compile(r'[\s,]*')
+
+# Maximum number of unique trends passed on to Claude
+MAX_TRENDS = 15
+
+# On-disk Serper response cache, reused for warm reruns within the TTL
+SERPER_CACHE_PATH = pathlib.Path(__file__).with_name('.serper_cache.json')
+SERPER_CACHE_TTL = 6 * 60 * 60  # seconds
+
+# Serper request pacing (requests per second, burst size)
+SERPER_RATE = 5
+SERPER_BURST = 5
+
+# Serper retry policy for rate limiting and transient server errors
+SERPER_RETRIES = 3
+SERPER_BACKOFF = 0.3  # seconds, doubled per attempt
+SERPER_MAX_RETRY_AFTER = 60  # seconds; ceiling on a server-sent Retry-After
+SERPER_RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# Sheet tabs written by save_to_sheets, with optional env vars holding their
+# numeric gids (saves a spreadsheets.get lookup per run when set)
+SHEET_GID_ENV = {
+    'Opportunities': 'PRINTIFY_OPPORTUNITIES_GID',
+    'Analysis': 'PRINTIFY_ANALYSIS_GID',
+}
+
+# Maximum rows per Opportunities appendCells request in a Sheets batchUpdate
+SHEETS_CHUNK_ROWS = 100
+
+
+def _now_str():
+    """Current local time formatted for logs and sheet rows"""
+    return time.strftime('%Y-%m-%d %H:%M:%S')
+
+
+def _chunks(items, size):
+    """Split a list into chunks of at most size items"""
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def _row_data(row):
+    """Convert a list of values to Sheets RowData, entered as-is (RAW)"""
+    return {'values': [
+        {} if value is None  # empty cell
+        else {'userEnteredValue': {'numberValue': value}}
+        if isinstance(value, (int, float)) and not isinstance(value, bool)
+        else {'userEnteredValue': {'stringValue': str(value)}}
+        for value in row
+    ]}
+
+
+def _clean_value(key, value):
+    """Coerce an opportunity field from Claude's JSON into a Sheets cell value"""
+    if key == 'demand_score':
+        if isinstance(value, int) and not isinstance(value, bool):
+            return value
+        score = DEMAND_SCORE_RE.search(str(value))
+        return int(score.group()) if score else 5
+    if isinstance(value, list):
+        return '\n'.join(str(item) for item in value)
+    if isinstance(value, dict):
+        return json.dumps(value)
+    return value
+
+
+def parse_json(text):
+    """Parse a JSON string, using orjson when it is installed"""
+    if orjson is not None:
+        return orjson.loads(text.encode())
+    return json.loads(text)
+
+
+@functools.lru_cache(maxsize=None)
+def load_credentials():
+    """Build the Google service-account credentials once per process"""
+    return service_account.Credentials.from_service_account_info(
+        parse_json(os.environ["GOOGLE_SERVICE_ACCOUNT"]),
+        scopes=['https://www.googleapis.com/auth/spreadsheets']
+    )
+
+
+class TokenBucket:
+    """Thread-safe token bucket for pacing outgoing API requests"""
+    
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+    
+    def acquire(self):
+        """Block until a token is available, then consume it"""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(
+                    self.capacity,
+                    self.tokens + (now - self.updated) * self.rate
+                )
+                self.updated = now
+                
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                
+                wait = (1 - self.tokens) / self.rate
+            
+            time.sleep(wait)
+
+
 class PrintifyTrendFinder:
     def __init__(self):
-        self.claude = anthropic.Anthropic(api_key=os.getenv("ANTHROPIC_API_KEY"))
-        
-        # Google APIs
-        credentials_dict = json.loads(os.getenv("GOOGLE_SERVICE_ACCOUNT"))
-        creds = service_account.Credentials.from_service_account_info(
-            credentials_dict,
-            scopes=['https://www.googleapis.com/auth/spreadsheets']
-        )
-        self.sheets_service = build('sheets', 'v4', credentials=creds)
-        
         self.sheet_id = os.getenv("PRINTIFY_SHEET_ID", "")
         self.serper_key = os.getenv("SERPER_API_KEY")
         
-        # USA demographic segments
-        self.target_audiences = [
-            'millennials', 'gen z', 'parents', 'dog owners', 'cat owners',
-            'teachers', 'nurses', 'fitness enthusiasts', 'gamers',
-            'book lovers', 'coffee lovers', 'outdoor enthusiasts'
-        ]
+        # HTTP/2 client for Serper: concurrent queries share one connection
+        self.http = httpx.Client(
+            http2=True,
+            timeout=10.0,
+            limits=httpx.Limits(max_keepalive_connections=8, max_connections=16)
+        )
+        self.bucket = TokenBucket(SERPER_RATE, SERPER_BURST)
         
-        # Product types for POD
-        self.product_types = [
-            't-shirt', 'hoodie', 'mug', 'tote bag', 'phone case',
-            'sticker', 'poster', 'canvas print', 'tank top'
-        ]
+        self.serper_cache = self._load_serper_cache()
+    
+    # API clients are built on first use, so a Serper-only run never touches
+    # Claude or Google credentials
+    @functools.cached_property
+    def claude(self):
+        """Anthropic client on a keep-alive HTTP/2 connection"""
+        return anthropic.Anthropic(
+            api_key=os.getenv("ANTHROPIC_API_KEY"),
+            http_client=anthropic.DefaultHttpxClient(
+                http2=True,
+                limits=httpx.Limits(max_keepalive_connections=8)
+            )
+        )
+    
+    @functools.cached_property
+    def sheets_service(self):
+        """Sheets client on the library's default authorized transport"""
+        return build(
+            'sheets', 'v4',
+            credentials=load_credentials(),
+            cache_discovery=False
+        )
+    
+    @functools.cached_property
+    def sheet_ids(self):
+        """Map of tab title to numeric sheetId (gid)"""
+        # Gids from the environment are used as-is; any tab without one
+        # costs a spreadsheets.get lookup
+        ids = {
+            title: int(os.environ[var])
+            for title, var in SHEET_GID_ENV.items() if os.getenv(var)
+        }
+        if len(ids) < len(SHEET_GID_ENV):
+            spreadsheet = self.sheets_service.spreadsheets().get(
+                spreadsheetId=self.sheet_id,
+                fields='sheets.properties(sheetId,title)'
+            ).execute()
+            for sheet in spreadsheet.get('sheets', []):
+                ids.setdefault(sheet['properties']['title'], sheet['properties']['sheetId'])
+        return ids
+    
+    def _load_serper_cache(self):
+        """Load cached Serper responses from disk"""
+        try:
+            return parse_json(SERPER_CACHE_PATH.read_text())
+        except (OSError, ValueError):
+            return {}
+    
+    def _save_serper_cache(self):
+        """Persist unexpired Serper responses to disk"""
+        now = time.time()
+        fresh = {
+            key: entry for key, entry in self.serper_cache.items()
+            if now - entry['t'] < SERPER_CACHE_TTL
+        }
+        try:
+            SERPER_CACHE_PATH.write_text(json.dumps(fresh))
+        except OSError as e:
+            print(f"  Error saving Serper cache: {e}")
+    
+    def _serper_cache_key(self, query):
+        """Cache key for a query, scoped to today's date"""
+        return hashlib.sha1(f"{query}|us|5|{date.today()}".encode()).hexdigest()
+    
+    def _serper_one(self, query):
+        """Run a single Serper search and cache its response"""
+        try:
+            for attempt in range(SERPER_RETRIES + 1):
+                backoff = SERPER_BACKOFF * 2 ** attempt
+                self.bucket.acquire()
+                try:
+                    response = self.http.post(
+                        'https://google.serper.dev/search',
+                        headers={'X-API-KEY': self.serper_key},
+                        json={'q': query, 'gl': 'us', 'num': 5}
+                    )
+                except httpx.TransportError:
+                    # Connect/read failures and timeouts are retried too
+                    if attempt == SERPER_RETRIES:
+                        raise
+                    time.sleep(backoff)
+                    continue
+                
+                if (response.status_code not in SERPER_RETRY_STATUSES
+                        or attempt == SERPER_RETRIES):
+                    break
+                
+                # Wait as long as Retry-After asks (up to a sane ceiling),
+                # otherwise back off exponentially
+                retry_after = response.headers.get('Retry-After', '')
+                time.sleep(
+                    min(int(retry_after), SERPER_MAX_RETRY_AFTER)
+                    if retry_after.isdigit() else backoff
+                )
+            
+            response.raise_for_status()
+            data = response.json()
+            
+            self.serper_cache[self._serper_cache_key(query)] = {
+                't': time.time(),
+                'data': data
+            }
+            return data
+            
+        except Exception as e:
+            print(f"  Error finding trends: {e}")
+            return {}
     
     def find_trending_topics(self):
         """Find trending topics, memes, events in USA"""
@@ -58,174 +342,165 @@ class PrintifyTrendFinder:
             "trending lifestyle USA"
         ]
         
+        # Serve warm queries from the cache, fetch the rest concurrently
+        results = {}
+        misses = []
         for query in queries:
-            try:
-                response = requests.post(
-                    'https://google.serper.dev/search',
-                    headers={'X-API-KEY': self.serper_key},
-                    json={'q': query, 'gl': 'us', 'num': 5},
-                    timeout=10
-                )
-                data = response.json()
-                
-                for item in data.get('organic', [])[:3]:
-                    trends.append({
-                        'title': item.get('title'),
-                        'snippet': item.get('snippet', ''),
-                        'url': item.get('link')
-                    })
-                
-                time.sleep(0.5)
-                
-            except Exception as e:
-                print(f"  Error finding trends: {e}")
+            entry = self.serper_cache.get(self._serper_cache_key(query))
+            if entry and time.time() - entry['t'] < SERPER_CACHE_TTL:
+                results[query] = entry['data']
+            else:
+                misses.append(query)
+        
+        if misses:
+            with ThreadPoolExecutor(max_workers=6) as executor:
+                results.update(zip(misses, executor.map(self._serper_one, misses)))
+            self._save_serper_cache()
+        
+        # Drop near-duplicate results that overlap between queries
+        seen_titles = set()
+        seen_snippets = set()
+        items = (
+            item for query in queries
+            for item in results[query].get('organic', [])[:3]
+        )
+        for item in items:
+            title_key = NON_WORD_RE.sub('', (item.get('title') or '').lower())[:80]
+            snippet = ' '.join((item.get('snippet') or '').lower().split())
+            snippet_key = hashlib.blake2b(snippet.encode(), digest_size=8).digest()
+            if title_key in seen_titles or snippet_key in seen_snippets:
+                continue
+            if title_key:
+                seen_titles.add(title_key)
+            if snippet:
+                seen_snippets.add(snippet_key)
+            
+            trends.append({
+                'title': item.get('title'),
+                'snippet': item.get('snippet', ''),
+                'url': item.get('link')
+            })
+            if len(trends) == MAX_TRENDS:
+                break
         
         return trends
     
     def analyze_niche_opportunities(self, trends_data):
         """Use Claude to analyze trends and suggest POD niches"""
         
-        formatted_trends = "\n\n".join([
+        formatted_trends = "\n\n".join(
             f"Trend: {t['title']}\n{t['snippet']}"
-            for t in trends_data[:15]
-        ])
+            for t in islice(trends_data, MAX_TRENDS)
+        )
         
-        prompt = f"""You are a print-on-demand business consultant specializing in USA market Printify/Shopify stores.
-
-Analyze these trending topics and themes from USA:
-
-{formatted_trends}
-
-Provide 10 SPECIFIC print-on-demand product opportunities. For each opportunity:
-
-1. NICHE NAME: (specific, not generic)
-2. TARGET AUDIENCE: Who buys this?
-3. DESIGN THEME: What should the design look like/say?
-4. PRODUCTS: Which POD products? (t-shirt, hoodie, mug, etc.)
-5. DEMAND SCORE: 1-10 (how hot is this trend?)
-6. COMPETITION: Low/Medium/High
-7. DESIGN EXAMPLES: 3 specific text/image ideas
-8. WHY IT WORKS: What makes this profitable?
-9. FACEBOOK AD ANGLE: How to market this?
-10. ESTIMATED MONTHLY REVENUE: Realistic estimate if executed well
-
-Focus on:
-- Specific niches (not just "dog lovers" but "golden retriever moms")
-- Actionable design ideas
-- USA cultural trends
-- Passion-based audiences
-- Gift-giving occasions
-- Identity/lifestyle niches
-
-Format each opportunity clearly with all 10 points."""
-
         try:
-            message = self.claude.messages.create(
+            with self.claude.messages.stream(
                 model="claude-sonnet-4-20250514",
-                max_tokens=4000,
-                messages=[{"role": "user", "content": prompt}]
-            )
+                max_tokens=NUM_OPPORTUNITIES * TOKENS_PER_OPPORTUNITY,
+                system=[{
+                    "type": "text",
+                    "text": STATIC_INSTRUCTIONS,
+                    "cache_control": {"type": "ephemeral"}
+                }],
+                messages=[{
+                    "role": "user",
+                    "content": f"Trending topics and themes from USA:\n\n{formatted_trends}"
+                }]
+            ) as stream:
+                # Receive tokens as they arrive instead of blocking on the
+                # full completion
+                buffer = io.StringIO()
+                for text in stream.text_stream:
+                    buffer.write(text)
+                
+                if stream.get_final_message().stop_reason == "max_tokens":
+                    print("  Warning: analysis hit max_tokens, JSON is likely truncated")
             
-            return message.content[0].text
+            return buffer.getvalue()
             
         except Exception as e:
             print(f"  Error with Claude: {e}")
             return "Analysis failed"
     
-    def extract_opportunities(self, analysis_text):
-        """Parse Claude's response into structured data"""
-        opportunities = []
+    def parse_opportunities(self, analysis_text):
+        """Parse Claude's JSON response into a list of opportunities"""
+        # Tolerate a markdown code fence or prose around the array
+        start = analysis_text.find('[')
+        if start == -1:
+            print("  No JSON array found in analysis")
+            return []
         
-        # Split by numbered opportunities
-        sections = analysis_text.split('\n\n')
-        
-        current_opp = {}
-        for section in sections:
-            if 'NICHE NAME:' in section or section.strip().startswith('1.') or section.strip().startswith('2.'):
-                if current_opp:
-                    opportunities.append(current_opp)
-                    current_opp = {}
-            
-            # Extract fields
-            if 'NICHE NAME:' in section:
-                current_opp['niche'] = section.split('NICHE NAME:')[1].split('\n')[0].strip()
-            elif 'TARGET AUDIENCE:' in section:
-                current_opp['audience'] = section.split('TARGET AUDIENCE:')[1].split('\n')[0].strip()
-            elif 'DESIGN THEME:' in section:
-                current_opp['design_theme'] = section.split('DESIGN THEME:')[1].split('\n')[0].strip()
-            elif 'PRODUCTS:' in section:
-                current_opp['products'] = section.split('PRODUCTS:')[1].split('\n')[0].strip()
-            elif 'DEMAND SCORE:' in section:
-                score_text = section.split('DEMAND SCORE:')[1].split('\n')[0].strip()
-                try:
-                    current_opp['demand_score'] = int(score_text.split('/')[0].strip())
-                except:
-                    current_opp['demand_score'] = 5
-            elif 'COMPETITION:' in section:
-                current_opp['competition'] = section.split('COMPETITION:')[1].split('\n')[0].strip()
-            elif 'DESIGN EXAMPLES:' in section:
-                current_opp['design_examples'] = section.split('DESIGN EXAMPLES:')[1].split('WHY IT WORKS:')[0].strip()
-            elif 'WHY IT WORKS:' in section:
-                current_opp['why_works'] = section.split('WHY IT WORKS:')[1].split('FACEBOOK AD ANGLE:')[0].strip()
-            elif 'FACEBOOK AD ANGLE:' in section:
-                current_opp['ad_angle'] = section.split('FACEBOOK AD ANGLE:')[1].split('ESTIMATED MONTHLY REVENUE:')[0].strip()
-            elif 'ESTIMATED MONTHLY REVENUE:' in section:
-                current_opp['est_revenue'] = section.split('ESTIMATED MONTHLY REVENUE:')[1].strip()
-        
-        if current_opp:
-            opportunities.append(current_opp)
+        # Decode one element at a time so a response cut off by max_tokens
+        # still yields every complete opportunity before the break
+        opportunities = []
+        pos = start + 1
+        while True:
+            pos = JSON_SEPARATOR_RE.match(analysis_text, pos).end()
+            if pos >= len(analysis_text) or analysis_text[pos] == ']':
+                break
+            try:
+                opp, pos = JSON_DECODER.raw_decode(analysis_text, pos)
+            except ValueError as e:
+                print(f"  Error parsing analysis JSON: {e}")
+                if opportunities:
+                    print(f"  Kept {len(opportunities)} complete opportunities")
+                break
+            if isinstance(opp, dict):
+                # Nulls are dropped so the column default applies instead
+                opportunities.append({
+                    key: _clean_value(key, value)
+                    for key, value in opp.items() if value is not None
+                })
         
         return opportunities
     
     def save_to_sheets(self, opportunities, raw_analysis):
-        """Save opportunities to Google Sheets"""
-        if not self.sheet_id or not opportunities:
-            print("  No opportunities to save")
+        """Save opportunities and the raw analysis to Google Sheets"""
+        if not self.sheet_id:
+            print("  No sheet configured, nothing saved")
             return
         
         try:
-            rows = []
-            for opp in opportunities:
-                row = [
-                    datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                    opp.get('niche', ''),
-                    opp.get('audience', ''),
-                    opp.get('design_theme', ''),
-                    opp.get('products', ''),
-                    opp.get('demand_score', 5),
-                    opp.get('competition', 'Medium'),
-                    opp.get('design_examples', ''),
-                    opp.get('why_works', ''),
-                    opp.get('ad_angle', ''),
-                    opp.get('est_revenue', ''),
-                    'Not started',  # status
-                    ''  # notes
-                ]
-                rows.append(row)
+            ts = _now_str()
             
-            body = {'values': rows}
-            self.sheets_service.spreadsheets().values().append(
-                spreadsheetId=self.sheet_id,
-                range='Opportunities!A:M',
-                valueInputOption='RAW',
-                body=body
-            ).execute()
+            rows = [
+                [ts, *(opp.get(key, default) for key, default in OPPORTUNITY_COLUMNS),
+                 'Not started', '']  # status, notes
+                for opp in opportunities
+            ]
+            
+            # Raw analysis goes to the second sheet
+            raw_row = [[ts, raw_analysis]]
             
-            print(f"\n  Saved {len(rows)} opportunities to Google Sheets")
+            missing = [title for title in SHEET_GID_ENV if title not in self.sheet_ids]
+            if missing:
+                print(f"  Error saving to Sheets: tab(s) not found: {', '.join(missing)}")
+                return
             
-            # Also save raw analysis to second sheet
-            raw_row = [[
-                datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                raw_analysis
-            ]]
+            # appendCells adds rows after the last filled row (growing the
+            # grid as needed) and writes both tabs in a single batchUpdate.
+            # Without the gid env vars, the gid lookup adds a second request.
+            requests = [
+                {'appendCells': {
+                    'sheetId': self.sheet_ids['Opportunities'],
+                    'rows': [_row_data(row) for row in chunk],
+                    'fields': 'userEnteredValue'
+                }}
+                for chunk in _chunks(rows, SHEETS_CHUNK_ROWS)
+            ]
+            requests.append({'appendCells': {
+                'sheetId': self.sheet_ids['Analysis'],
+                'rows': [_row_data(row) for row in raw_row],
+                'fields': 'userEnteredValue'
+            }})
             
-            self.sheets_service.spreadsheets().values().append(
+            self.sheets_service.spreadsheets().batchUpdate(
                 spreadsheetId=self.sheet_id,
-                range='Analysis!A:B',
-                valueInputOption='RAW',
-                body={'values': raw_row}
+                body={'requests': requests}
             ).execute()
             
+            print(f"\n  Saved {len(rows)} opportunities and the raw analysis to Google Sheets")
+            
         except Exception as e:
             print(f"  Error saving to Sheets: {e}")
     
@@ -234,7 +509,7 @@ Format each opportunity clearly with all 10 points."""
         print("=" * 70)
         print("🎨 USA PRINTIFY/POD TREND FINDER")
         print("=" * 70)
-        print(f"📅 {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+        print(f"📅 {_now_str()}")
         print()
         
         print("🔍 Finding trending topics in USA...")
@@ -249,13 +524,14 @@ Format each opportunity clearly with all 10 points."""
         analysis = self.analyze_niche_opportunities(trends)
         
         print("\n📊 Extracting opportunities...")
-        opportunities = self.extract_opportunities(analysis)
+        opportunities = self.parse_opportunities(analysis)
         print(f"  Extracted {len(opportunities)} niche opportunities")
         
+        # The raw analysis is saved even when nothing could be extracted
+        print("\n💾 Saving to Google Sheets...")
+        self.save_to_sheets(opportunities, analysis)
+        
         if opportunities:
-            print("\n💾 Saving to Google Sheets...")
-            self.save_to_sheets(opportunities, analysis)
-            
             print("\n" + "=" * 70)
             print("🎯 TOP 3 OPPORTUNITIES")
             print("=" * 70)